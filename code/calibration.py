@@ -10,64 +10,77 @@ Uses known "monster" curves to fit the calibration and test the 1/√e hypothesi
 
 import json
 import math
-from typing import List, Dict, Tuple
+from functools import cache
+from typing import Dict, Optional
 import numpy as np
-from scipy import stats
+from scipy.special import stdtr
 
 
 # The theoretical slope (1/√e)
 THEORETICAL_SLOPE = 1 / math.sqrt(math.e)  # 0.6065306597...
 
 
-# Known monster calibration points
-CALIBRATION_MONSTERS = [
-    {'label': '165066.v1', 'sha': 5625, 'D': 2.27, 'name': 'Leviathan'},
-    {'label': '287175.n1', 'sha': 2500, 'D': 2.06, 'name': 'Titan'},
-    {'label': '146850.cb1', 'sha': 2209, 'D': 2.03, 'name': 'Behemoth'},
-    {'label': '234446.p1', 'sha': 1849, 'D': 1.98},
-    {'label': '279022.ca1', 'sha': 1681, 'D': 1.95},
-    {'label': '95438.c2', 'sha': 676, 'D': 1.71, 'name': 'Original Monster'},
-    {'label': 'various_529', 'sha': 529, 'D': 1.65},
-    {'label': 'various_361', 'sha': 361, 'D': 1.55},
-    {'label': 'various_289', 'sha': 289, 'D': 1.49},
-]
+# Known monster calibration points, stored as parallel arrays
+# (structure-of-arrays). The last entry is the d3 anomaly (3σ outlier).
+LABELS = np.array([
+    '165066.v1', '287175.n1', '146850.cb1', '234446.p1', '279022.ca1',
+    '95438.c2', 'various_529', 'various_361', 'various_289', '165066.d3',
+])
+SHA = np.array([5625, 2500, 2209, 1849, 1681, 676, 529, 361, 289, 1225],
+               dtype=np.int64)
+D = np.array([2.27, 2.06, 2.03, 1.98, 1.95, 1.71, 1.65, 1.55, 1.49, 2.50])
+ANOMALY = LABELS == '165066.d3'
 
-# The d3 anomaly (3σ outlier)
-D3_ANOMALY = {'label': '165066.d3', 'sha': 1225, 'D': 2.50, 'anomaly': True}
+# log₁₀|Ш| for every calibration point, computed once at import
+LOG_SHA = np.log10(SHA)
 
+# Index of the d3 anomaly within the arrays above
+D3_INDEX = int(np.flatnonzero(ANOMALY)[0])
 
-def fit_calibration(monsters: List[Dict], exclude_anomalies: bool = True) -> Dict:
+
+def fit_calibration(sha: np.ndarray, D: np.ndarray, labels: np.ndarray,
+                    exclude: Optional[np.ndarray] = None,
+                    log_sha: Optional[np.ndarray] = None) -> Dict:
     """
     Fit the diffusion law to calibration data.
     
     Parameters
     ----------
-    monsters : List[Dict]
-        Calibration data points with 'sha' and 'D' keys
-    exclude_anomalies : bool
-        Whether to exclude points marked as anomalies
+    sha : np.ndarray
+        |Ш| for each calibration point
+    D : np.ndarray
+        Measured diffusion index for each point
+    labels : np.ndarray
+        Curve labels, used to annotate the residuals
+    exclude : np.ndarray, optional
+        Boolean mask of points to leave out (e.g. ANOMALY)
+    log_sha : np.ndarray, optional
+        Precomputed log₁₀|Ш| aligned with ``sha`` (e.g. LOG_SHA)
         
     Returns
     -------
     Dict
         Fit results including slope, intercept, R², and residuals
     """
-    # Filter anomalies if requested
-    if exclude_anomalies:
-        data = [m for m in monsters if not m.get('anomaly', False)]
-    else:
-        data = monsters
+    if log_sha is None:
+        log_sha = np.log10(sha)
     
-    # Extract arrays
-    log_sha = np.array([math.log10(m['sha']) for m in data])
-    D = np.array([m['D'] for m in data])
+    # Filter excluded points
+    if exclude is not None:
+        keep = ~exclude
+        sha, D, labels, log_sha = sha[keep], D[keep], labels[keep], log_sha[keep]
     
-    # Linear regression
-    slope, intercept, r_value, p_value, std_err = stats.linregress(log_sha, D)
+    # Closed-form OLS; cov is scaled by the residual variance on n - 2 dof
+    (slope, intercept), cov = np.polyfit(log_sha, D, 1, cov=True)
+    std_err = np.sqrt(cov[0, 0])
     
     # Residuals
     D_predicted = slope * log_sha + intercept
     residuals = D - D_predicted
+    r_squared = 1 - np.sum(residuals ** 2) / np.sum((D - D.mean()) ** 2)
+    
+    # Two-sided p-value for H0: slope = 0 (see test_slope_hypothesis)
+    p_value = 2.0 * stdtr(len(D) - 2, -abs(slope / std_err))
     
     # Z-scores
     residual_std = np.std(residuals)
@@ -76,22 +89,25 @@ def fit_calibration(monsters: List[Dict], exclude_anomalies: bool = True) -> Dic
     return {
         'slope': slope,
         'intercept': intercept,
-        'r_squared': r_value ** 2,
+        'r_squared': r_squared,
         'p_value': p_value,
         'std_err': std_err,
         'theoretical_slope': THEORETICAL_SLOPE,
         'slope_ratio': slope / THEORETICAL_SLOPE,
-        'n_points': len(data),
+        'n_points': len(D),
         'residuals': [
             {
-                'label': data[i]['label'],
-                'sha': data[i]['sha'],
-                'D_measured': D[i],
-                'D_predicted': D_predicted[i],
-                'residual': residuals[i],
-                'z_score': z_scores[i]
+                'label': label,
+                'sha': sha_i,
+                'D_measured': D_i,
+                'D_predicted': predicted,
+                'residual': residual,
+                'z_score': z
             }
-            for i in range(len(data))
+            for label, sha_i, D_i, predicted, residual, z in zip(
+                labels.tolist(), sha.tolist(), D.tolist(),
+                D_predicted.tolist(), residuals.tolist(), z_scores.tolist()
+            )
         ]
     }
 
@@ -101,10 +117,15 @@ def test_slope_hypothesis(slope: float, std_err: float, n: int) -> Dict:
     Test whether the observed slope equals 1/√e.
     
     Uses a t-test: H0: slope = 1/√e
+    
+    The two-sided p-value is 2·P(T < -|t|). By symmetry this equals the
+    survival function 2·P(T > |t|), but evaluating the lower-tail CDF
+    directly with scipy.special.stdtr avoids both the scipy.stats
+    distribution wrapper and the cancellation in 1 - cdf for large |t|.
     """
     t_stat = (slope - THEORETICAL_SLOPE) / std_err
     df = n - 2
-    p_value = 2 * (1 - stats.t.cdf(abs(t_stat), df))
+    p_value = 2.0 * stdtr(df, -abs(t_stat))
     
     return {
         'observed_slope': slope,
@@ -118,10 +139,14 @@ def test_slope_hypothesis(slope: float, std_err: float, n: int) -> Dict:
     }
 
 
+@cache
 def build_calibration_report() -> Dict:
     """
     Build complete calibration report.
     
+    The calibration set is fixed, so the report is computed once and the
+    same dict is returned on later calls; copy it before mutating.
+    
     Returns
     -------
     Dict
@@ -131,14 +156,11 @@ def build_calibration_report() -> Dict:
         - Hypothesis test
         - Anomaly analysis
     """
-    # Include d3 in full dataset
-    all_monsters = CALIBRATION_MONSTERS + [D3_ANOMALY]
-    
-    # Fit with all data
-    fit_all = fit_calibration(all_monsters, exclude_anomalies=False)
+    # Fit with all data (d3 included)
+    fit_all = fit_calibration(SHA, D, LABELS, log_sha=LOG_SHA)
     
     # Fit excluding anomaly
-    fit_clean = fit_calibration(all_monsters, exclude_anomalies=True)
+    fit_clean = fit_calibration(SHA, D, LABELS, exclude=ANOMALY, log_sha=LOG_SHA)
     
     # Hypothesis test on clean data
     hypothesis_test = test_slope_hypothesis(
@@ -148,17 +170,17 @@ def build_calibration_report() -> Dict:
     )
     
     # Analyze d3 anomaly
-    d3_predicted = fit_clean['slope'] * math.log10(D3_ANOMALY['sha']) + fit_clean['intercept']
-    d3_residual = D3_ANOMALY['D'] - d3_predicted
+    d3_predicted = fit_clean['slope'] * LOG_SHA[D3_INDEX] + fit_clean['intercept']
+    d3_residual = D[D3_INDEX] - d3_predicted
     
     return {
         'fit_all_data': fit_all,
         'fit_excluding_d3': fit_clean,
         'hypothesis_test': hypothesis_test,
         'd3_anomaly': {
-            'label': D3_ANOMALY['label'],
-            'sha': D3_ANOMALY['sha'],
-            'D_measured': D3_ANOMALY['D'],
+            'label': str(LABELS[D3_INDEX]),
+            'sha': int(SHA[D3_INDEX]),
+            'D_measured': float(D[D3_INDEX]),
             'D_predicted': d3_predicted,
             'residual': d3_residual,
             'z_score': d3_residual / np.std([r['residual'] for r in fit_clean['residuals']]),
@@ -175,27 +197,19 @@ def build_calibration_report() -> Dict:
     }
 
 
+def _json_default(obj):
+    """Convert NumPy scalars and arrays that json cannot encode natively."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def save_calibration(report: Dict, filepath: str = 'calibration_curve.json'):
     """Save calibration report to JSON."""
-    # Convert numpy types to Python types for JSON
-    def convert(obj):
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        if isinstance(obj, (np.float64, np.float32)):
-            return float(obj)
-        if isinstance(obj, (np.int64, np.int32)):
-            return int(obj)
-        return obj
-    
-    def deep_convert(obj):
-        if isinstance(obj, dict):
-            return {k: deep_convert(v) for k, v in obj.items()}
-        if isinstance(obj, list):
-            return [deep_convert(i) for i in obj]
-        return convert(obj)
-    
     with open(filepath, 'w') as f:
-        json.dump(deep_convert(report), f, indent=2)
+        json.dump(report, f, indent=2, default=_json_default)
     
     print(f"Saved calibration to {filepath}")
 
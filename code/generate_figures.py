@@ -11,13 +11,16 @@ Usage:
     python generate_figures.py
 """
 
-import json
-import math
 import os
+from typing import Dict, Optional
 
+import matplotlib
+matplotlib.use('Agg')  # headless: skip GUI toolkit initialisation
 import matplotlib.pyplot as plt
 import numpy as np
 
+from calibration import build_calibration_report, LABELS, SHA, D, LOG_SHA, ANOMALY
+
 
 # Style configuration
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -25,55 +28,67 @@ FIGURE_DPI = 300
 FIGURE_FORMAT = 'png'  # or 'pdf'
 
 
-# Calibration data
-MONSTERS = [
-    {'label': '165066.v1', 'sha': 5625, 'D': 2.27, 'name': 'Leviathan'},
-    {'label': '287175.n1', 'sha': 2500, 'D': 2.06},
-    {'label': '146850.cb1', 'sha': 2209, 'D': 2.03},
-    {'label': '234446.p1', 'sha': 1849, 'D': 1.98},
-    {'label': '279022.ca1', 'sha': 1681, 'D': 1.95},
-    {'label': '165066.d3', 'sha': 1225, 'D': 2.50, 'anomaly': True},
-    {'label': '95438.c2', 'sha': 676, 'D': 1.71, 'name': 'Monster #1'},
-    {'label': 'various_529', 'sha': 529, 'D': 1.65},
-    {'label': 'various_361', 'sha': 361, 'D': 1.55},
-    {'label': 'various_289', 'sha': 289, 'D': 1.49},
-]
+# Annotation names used in Figure 1
+NAMES = {'165066.v1': 'Leviathan', '95438.c2': 'Monster #1'}
+
+
+def load_figure_data() -> Dict:
+    """
+    Collect the calibration arrays and fit shared by Figures 1 and 3.
+    
+    Points are ordered by |Ш| (largest first). Residuals are taken from
+    build_calibration_report() against the fit excluding d3, so the
+    figures and the calibration JSON never disagree.
+    """
+    report = build_calibration_report()
+    fit = report['fit_excluding_d3']
+    
+    residual_by_label = {r['label']: r['residual'] for r in fit['residuals']}
+    residual_by_label[report['d3_anomaly']['label']] = report['d3_anomaly']['residual']
+    
+    order = np.argsort(-SHA, kind='stable')
+    labels = LABELS[order]
+    return {
+        'fit': fit,
+        'labels': labels,
+        'log_sha': LOG_SHA[order],
+        'D': D[order],
+        'anomaly': ANOMALY[order],
+        'residuals': np.array([residual_by_label[l] for l in labels.tolist()]),
+    }
 
 
-def fig1_calibration_curve(output_dir: str = '../results'):
+def fig1_calibration_curve(output_dir: str = '../results',
+                           data: Optional[Dict] = None):
     """Generate Figure 1: The calibration curve."""
+    if data is None:
+        data = load_figure_data()
+    fit = data['fit']
+    log_sha, D, anomaly, labels = data['log_sha'], data['D'], data['anomaly'], data['labels']
     
     fig, ax = plt.subplots(figsize=(10, 7))
     
     # Separate normal points and anomaly
-    normal = [m for m in MONSTERS if not m.get('anomaly', False)]
-    anomaly = [m for m in MONSTERS if m.get('anomaly', False)]
-    
-    # Data arrays
-    log_sha_normal = [math.log10(m['sha']) for m in normal]
-    D_normal = [m['D'] for m in normal]
+    normal = ~anomaly
     
     # Fit line (excluding anomaly)
-    slope = 1 / math.sqrt(math.e)  # 0.6065
-    intercept = -0.0025
+    slope, intercept = fit['slope'], fit['intercept']
     x_fit = np.linspace(2.2, 4.0, 100)
     y_fit = slope * x_fit + intercept
     
     # Plot fit line
     ax.plot(x_fit, y_fit, 'b-', linewidth=2, 
-            label=f'D = (1/√e) × log₁₀|Ш| + C\nm = 0.6065, C = −0.0025')
+            label=f'D = (1/√e) × log₁₀|Ш| + C\nm = {slope:.4f}, C = {intercept:.4f}'.replace('-', '−'))
     
     # Plot normal points
-    ax.scatter(log_sha_normal, D_normal, s=100, c='green', 
-               edgecolors='black', linewidth=1, zorder=5,
-               label=f'Normal Ghosts (n=9, R² = 0.9999)')
+    ax.scatter(log_sha[normal], D[normal], s=100, c='green', 
+               edgecolors='black', linewidth=1, zorder=5, rasterized=True,
+               label=f"Normal Ghosts (n={fit['n_points']}, R² = {fit['r_squared']:.4f})")
     
     # Plot anomaly
-    if anomaly:
-        log_sha_anom = math.log10(anomaly[0]['sha'])
-        D_anom = anomaly[0]['D']
-        ax.scatter([log_sha_anom], [D_anom], s=200, c='red', 
-                   marker='*', edgecolors='black', linewidth=1, zorder=6,
+    if anomaly.any():
+        ax.scatter(log_sha[anomaly], D[anomaly], s=200, c='red', 
+                   marker='*', edgecolors='black', linewidth=1, zorder=6, rasterized=True,
                    label=f'd3 Anomaly (+0.57, 3.0σ)')
     
     # Labels
@@ -82,16 +97,16 @@ def fig1_calibration_curve(output_dir: str = '../results'):
     ax.set_title('Ghost Rank Calibration Curve\nD = (1/√e) × log₁₀|Ш| + C', fontsize=16)
     
     # Annotations
-    for m in normal[:3]:  # Label top 3
-        name = m.get('name', m['label'])
+    for i in np.flatnonzero(normal)[:3]:  # Label top 3
+        name = NAMES.get(labels[i], labels[i])
         ax.annotate(name, 
-                   (math.log10(m['sha']), m['D']),
+                   (log_sha[i], D[i]),
                    xytext=(10, 10), textcoords='offset points',
                    fontsize=10, alpha=0.8)
     
     # R² annotation
     ax.text(0.05, 0.95, 
-            f'Excluding d3:\nR² = 0.9999\nm = 0.6065 ≈ 1/√e',
+            f"Excluding d3:\nR² = {fit['r_squared']:.4f}\nm = {slope:.4f} ≈ 1/√e",
             transform=ax.transAxes, fontsize=11,
             verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
@@ -103,7 +118,7 @@ def fig1_calibration_curve(output_dir: str = '../results'):
     plt.tight_layout()
     
     filepath = os.path.join(output_dir, f'fig1_calibration_curve.{FIGURE_FORMAT}')
-    plt.savefig(filepath, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.savefig(filepath, dpi=FIGURE_DPI)
     print(f"Saved: {filepath}")
     plt.close()
 
@@ -132,7 +147,7 @@ def fig2_monster_parade(output_dir: str = '../results'):
     colors = ['red' if '†' in m[0] else 'steelblue' for m in monsters]
     
     y_pos = range(len(labels))
-    bars = ax.barh(y_pos, sha_values, color=colors, edgecolor='black')
+    bars = ax.barh(y_pos, sha_values, color=colors, edgecolor='black', rasterized=True)
     
     # Labels on bars
     for i, (bar, m) in enumerate(zip(bars, monsters)):
@@ -162,39 +177,28 @@ def fig2_monster_parade(output_dir: str = '../results'):
     plt.tight_layout()
     
     filepath = os.path.join(output_dir, f'fig2_monster_parade.{FIGURE_FORMAT}')
+    # value labels extend past the axes, so keep the tight bounding box
     plt.savefig(filepath, dpi=FIGURE_DPI, bbox_inches='tight')
     print(f"Saved: {filepath}")
     plt.close()
 
 
-def fig3_d3_anomaly(output_dir: str = '../results'):
+def fig3_d3_anomaly(output_dir: str = '../results',
+                    data: Optional[Dict] = None):
     """Generate Figure 3: The d3 anomaly analysis."""
+    if data is None:
+        data = load_figure_data()
+    residuals, anomaly, labels = data['residuals'], data['anomaly'], data['labels']
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
     # Left panel: Residuals
-    normal = [m for m in MONSTERS if not m.get('anomaly', False)]
-    
-    # Compute residuals
-    slope = 1 / math.sqrt(math.e)
-    intercept = -0.0025
-    
-    residuals = []
-    for m in MONSTERS:
-        predicted = slope * math.log10(m['sha']) + intercept
-        residual = m['D'] - predicted
-        residuals.append({
-            'label': m['label'],
-            'residual': residual,
-            'anomaly': m.get('anomaly', False)
-        })
-    
-    colors = ['red' if r['anomaly'] else 'steelblue' for r in residuals]
+    colors = ['red' if a else 'steelblue' for a in anomaly]
     y_pos = range(len(residuals))
     
-    ax1.barh(y_pos, [r['residual'] for r in residuals], color=colors, edgecolor='black')
+    ax1.barh(y_pos, residuals, color=colors, edgecolor='black', rasterized=True)
     ax1.set_yticks(y_pos)
-    ax1.set_yticklabels([r['label'] for r in residuals])
+    ax1.set_yticklabels(labels)
     ax1.axvline(x=0, color='black', linestyle='-', linewidth=1)
     ax1.axvline(x=0.15, color='gray', linestyle='--', linewidth=1, alpha=0.7, label='1.5σ threshold')
     ax1.set_xlabel('Residual (D_measured - D_predicted)', fontsize=12)
@@ -203,13 +207,13 @@ def fig3_d3_anomaly(output_dir: str = '../results'):
     ax1.legend()
     
     # Right panel: Z-scores
-    residual_std = np.std([r['residual'] for r in residuals if not r['anomaly']])
-    z_scores = [r['residual'] / residual_std for r in residuals]
+    residual_std = np.std(residuals[~anomaly])
+    z_scores = residuals / residual_std
     
     colors = ['red' if z > 2.5 else 'steelblue' for z in z_scores]
-    ax2.barh(y_pos, z_scores, color=colors, edgecolor='black')
+    ax2.barh(y_pos, z_scores, color=colors, edgecolor='black', rasterized=True)
     ax2.set_yticks(y_pos)
-    ax2.set_yticklabels([r['label'] for r in residuals])
+    ax2.set_yticklabels(labels)
     ax2.axvline(x=0, color='black', linestyle='-', linewidth=1)
     ax2.axvline(x=2, color='orange', linestyle='--', linewidth=1, label='2σ')
     ax2.axvline(x=3, color='red', linestyle='--', linewidth=1, label='3σ')
@@ -222,6 +226,7 @@ def fig3_d3_anomaly(output_dir: str = '../results'):
     plt.tight_layout()
     
     filepath = os.path.join(output_dir, f'fig3_d3_anomaly.{FIGURE_FORMAT}')
+    # suptitle sits above the axes (y=1.02), so keep the tight bounding box
     plt.savefig(filepath, dpi=FIGURE_DPI, bbox_inches='tight')
     print(f"Saved: {filepath}")
     plt.close()
@@ -236,9 +241,12 @@ def main():
     output_dir = '../results'
     os.makedirs(output_dir, exist_ok=True)
     
-    fig1_calibration_curve(output_dir)
+    # Fit and residuals are computed once and shared by Figures 1 and 3
+    data = load_figure_data()
+    
+    fig1_calibration_curve(output_dir, data=data)
     fig2_monster_parade(output_dir)
-    fig3_d3_anomaly(output_dir)
+    fig3_d3_anomaly(output_dir, data=data)
     
     print("\n" + "=" * 60)
     print("ALL FIGURES GENERATED")
@@ -6,102 +6,405 @@ Batch processing tool for detecting Ghost curves in elliptic curve datasets.
 
 Usage:
     python ghost_detector.py --input data.csv --output ghosts.csv
+    python ghost_detector.py --input huge.csv --chunksize 1000000 --jobs 0
 """
 
 import argparse
 import csv
+import json
 import math
-from typing import List, Dict, Any
-from stability_metric import compute_stability, classify_ghost, GHOST_THRESHOLD
+import os
+import shutil
+import tempfile
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Iterator, Optional, TextIO, Tuple, Union
+import numpy as np
+from stability_metric import compute_inverse_denominator, GHOST_THRESHOLD
 
 
-def load_curves(filepath: str) -> List[Dict[str, Any]]:
+# Floating-point type of the detector's working columns. The threshold
+# S < 0.025 is meaningful to ~2 significant figures, so float32 is ample
+# and halves memory and bandwidth; only curves within rounding distance
+# of the threshold are ambiguous (see detect_ghosts).
+WORKING_DTYPE = np.float32
+
+# Relative distance from GHOST_THRESHOLD within which float32 rounding of
+# the inputs, log(N) and the division can flip the classification
+THRESHOLD_RTOL = 8 * np.finfo(WORKING_DTYPE).eps
+
+# Numeric CSV columns and their defaults when absent from the header
+CURVE_COLUMNS = {
+    'conductor': (np.int64, 0),
+    'rank': (np.int64, 0),
+    'sha': (WORKING_DTYPE, 1.0),
+    'L_value': (WORKING_DTYPE, 1.0),
+    'L_prime': (WORKING_DTYPE, 0.1),
+}
+
+
+# Input columns carried through to the Ghost table
+GHOST_COLUMNS = ['label'] + list(CURVE_COLUMNS)
+
+# Columns persisted by load_curves' on-disk cache, and the file in the
+# cache recording which version of the CSV they were parsed from
+CACHED_COLUMNS = GHOST_COLUMNS + ['log_N', 'inv_denom']
+CACHE_MANIFEST = 'manifest.json'
+
+
+def _read_columns(f: TextIO, usecols: List[int], dtype) -> np.ndarray:
+    """
+    Parse the given CSV columns of the remaining lines in C via np.loadtxt.
+    
+    ``#`` is ordinary data in a CSV (labels may contain it), so comment
+    handling is disabled. Blank lines are skipped and a header-only file
+    yields empty columns, both silently as csv.DictReader did.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='loadtxt: input contained no data')
+        warnings.filterwarnings('ignore', message=r'Input line \d+ contained no data')
+        return np.loadtxt(f, delimiter=',', quotechar='"', comments=None,
+                          usecols=usecols, dtype=dtype, ndmin=1)
+
+
+def _log_conductor(conductor: np.ndarray, dtype=WORKING_DTYPE) -> np.ndarray:
+    """log(N) in ``dtype``, the working precision by default (-inf/nan for N <= 0)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(conductor.astype(dtype))
+
+
+def _cache_dir(filepath: str) -> str:
+    """Directory holding the column cache for ``filepath``."""
+    return filepath + '.npcache'
+
+
+def _source_signature(filepath: str) -> Dict[str, int]:
+    """Size and mtime (ns) of the CSV, recorded in the cache manifest."""
+    st = os.stat(filepath)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _load_cached_curves(filepath: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Memory-map the cached columns of ``filepath``, if the cache is valid.
+    
+    The cache is valid when its manifest matches the CSV's current size
+    and mtime exactly (so replacing the CSV with an older file still
+    invalidates it), every column file loads, and all columns have the
+    same length and expected dtype.
+    """
+    cache = _cache_dir(filepath)
+    try:
+        with open(os.path.join(cache, CACHE_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest != _source_signature(filepath):
+        return None
+    
+    paths = {name: os.path.join(cache, name + '.npy') for name in CACHED_COLUMNS}
+    try:
+        curves = {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+    except (OSError, ValueError):
+        return None  # damaged (e.g. truncated) cache: rebuild it
+    n_rows = len(curves['conductor'])
+    for name, column in curves.items():
+        expected = CURVE_COLUMNS[name][0] if name in CURVE_COLUMNS else None
+        if len(column) != n_rows or (expected is not None and column.dtype != expected):
+            return None
+    if curves['log_N'].dtype != WORKING_DTYPE:
+        return None
+    return curves
+
+
+def _save_cached_curves(filepath: str, curves: Dict[str, np.ndarray],
+                        signature: Dict[str, int]):
+    """
+    Write each column to the cache as an uncompressed (mmap-able) .npy,
+    plus a manifest recording the ``signature`` of the CSV they came from.
+    
+    The columns are written to a temporary directory that is then renamed
+    into place, so concurrent readers see either the old cache or the
+    complete new one, never partial files.
     """
-    Load elliptic curve data from CSV.
+    cache = _cache_dir(filepath)
+    parent, base = os.path.split(os.path.abspath(cache))
+    try:
+        tmp = tempfile.mkdtemp(prefix=base + '.', suffix='.npcache', dir=parent)
+    except OSError:
+        return  # read-only location: just skip the cache
+    try:
+        for name in CACHED_COLUMNS:
+            np.save(os.path.join(tmp, name + '.npy'), curves[name])
+        with open(os.path.join(tmp, CACHE_MANIFEST), 'w') as f:
+            json.dump(signature, f)
+        stale = None
+        if os.path.isdir(cache):
+            stale = tempfile.mkdtemp(prefix=base + '.', suffix='.npcache', dir=parent)
+            os.replace(cache, stale)
+        os.replace(tmp, cache)
+        if stale is not None:
+            shutil.rmtree(stale, ignore_errors=True)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_header(f: TextIO) -> Dict[str, int]:
+    """Read the CSV header line and map column names to positions."""
+    header = next(csv.reader([f.readline()]))
+    return {name.strip(): i for i, name in enumerate(header)}
+
+
+def _parse_curves(source: Union[TextIO, List[str]],
+                  position: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """
+    Parse CSV body rows into column arrays.
+    
+    ``source`` is either a file positioned just after the header or a
+    list of raw lines (one chunk); both are read twice, once for the
+    numeric columns and once for the labels.
+    """
+    start = source.tell() if hasattr(source, 'seek') else None
+    
+    label_col = position.get('lmfdb_label', position.get('label'))
+    present = [name for name in CURVE_COLUMNS if name in position]
+    
+    table = None
+    if present:
+        table = _read_columns(
+            source, [position[name] for name in present],
+            [(name, CURVE_COLUMNS[name][0]) for name in present]
+        )
+    n_rows = len(table) if table is not None else None
+    
+    labels = None
+    if label_col is not None:
+        if start is not None:
+            source.seek(start)
+        labels = _read_columns(source, [label_col], str)
+        n_rows = len(labels)
+    
+    if n_rows is None:
+        if position:
+            raise ValueError("No usable columns in CSV header")
+        n_rows = 0  # zero-byte file: no header and no rows
+    
+    curves = {
+        'label': labels if labels is not None else np.full(n_rows, '', dtype=str),
+    }
+    for name, (dtype, default) in CURVE_COLUMNS.items():
+        if name in present:
+            curves[name] = np.ascontiguousarray(table[name])
+        else:
+            curves[name] = np.full(n_rows, default, dtype=dtype)
+    
+    # The metric only uses magnitudes; take them once here so the
+    # detector's kernel needs no abs()
+    for name in ('L_value', 'L_prime'):
+        np.abs(curves[name], out=curves[name])
+    return curves
+
+
+def _add_derived_columns(curves: Dict[str, np.ndarray]):
+    """Add the log_N and inv_denom columns detect_ghosts reuses."""
+    curves['log_N'] = _log_conductor(curves['conductor'])
+    curves['inv_denom'] = compute_inverse_denominator(curves['L_value'], curves['log_N'])
+
+
+def load_curves(filepath: str, use_cache: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Load elliptic curve data from CSV into NumPy column arrays.
+    
+    By default (``use_cache=True``) this also writes a ``<input>.npcache``
+    directory next to the CSV; pass ``use_cache=False`` to leave the data
+    directory untouched.
     
     Expected columns: label, conductor, rank, sha (optional), 
                       L_value (optional), L_prime (optional)
+    
+    L_value and L_prime are stored as magnitudes |L(E,1)| and |L'(E,1)|.
+    The file is parsed column-wise by NumPy's C reader rather than
+    row-by-row into dicts, together with the derived log_N and inv_denom
+    columns.
+    
+    With ``use_cache``, later loads memory-map the cached columns instead
+    of parsing; the cache is rebuilt whenever the CSV's size or mtime
+    changes.
+    
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Read-only column arrays (memory-mapped when served from the
+        cache); copy a column before modifying it
     """
-    curves = []
-    with open(filepath, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            curves.append({
-                'label': row.get('lmfdb_label', row.get('label', '')),
-                'conductor': int(row.get('conductor', 0)),
-                'rank': int(row.get('rank', 0)),
-                'sha': float(row.get('sha', 1)),
-                'L_value': float(row.get('L_value', 1)),
-                'L_prime': float(row.get('L_prime', 0.1)),
-            })
+    if use_cache:
+        curves = _load_cached_curves(filepath)
+        if curves is not None:
+            return curves
+        # Taken before parsing, so a CSV modified mid-parse is re-read next time
+        signature = _source_signature(filepath)
+    
+    with open(filepath, 'r', newline='') as f:
+        curves = _parse_curves(f, _read_header(f))
+    _add_derived_columns(curves)
+    
+    if use_cache:
+        _save_cached_curves(filepath, curves, signature)
+    # Read-only like the memory-mapped columns of a cached load, so code
+    # that works on the first run keeps working on the next
+    for column in curves.values():
+        column.flags.writeable = False
     return curves
 
 
-def detect_ghosts(curves: List[Dict], rank_filter: int = 0) -> List[Dict]:
+def _iter_line_chunks(f: TextIO, chunksize: int) -> Iterator[List[str]]:
+    """Yield the remaining lines of ``f`` in lists of at most ``chunksize``."""
+    while True:
+        lines = list(islice(f, chunksize))
+        if not lines:
+            break
+        yield lines
+
+
+def detect_ghosts(curves: Dict[str, np.ndarray], rank_filter: int = 0,
+                  threshold: float = GHOST_THRESHOLD) -> Dict[str, np.ndarray]:
     """
     Detect Ghost curves in a dataset.
     
     Parameters
     ----------
-    curves : List[Dict]
-        List of curve data dictionaries
+    curves : Dict[str, np.ndarray]
+        Column arrays as returned by load_curves(), whose 'L_value' and
+        'L_prime' hold magnitudes; a precomputed 'inv_denom' column is
+        reused, which makes threshold sweeps cheap. Tables without it are
+        checked once per call: negative L columns raise ValueError
     rank_filter : int
         Only process curves with this rank (default: 0)
+    threshold : float
+        Classification threshold (default: GHOST_THRESHOLD)
         
     Returns
     -------
-    List[Dict]
-        Curves classified as Ghosts with analysis data
-    """
-    ghosts = []
-    
-    for curve in curves:
-        if curve['rank'] != rank_filter:
-            continue
-            
-        if curve['conductor'] <= 1:
-            continue
-            
-        stability = compute_stability(
-            L_prime=curve['L_prime'],
-            L_value=curve['L_value'],
-            conductor=curve['conductor']
-        )
-        
-        if classify_ghost(stability):
-            ghosts.append({
-                **curve,
-                'stability': stability,
-                'diffusion': -math.log10(stability) if stability > 0 else float('inf')
-            })
+    Dict[str, np.ndarray]
+        Columns of the curves classified as Ghosts, plus their
+        'stability' and 'diffusion', sorted by Sha (largest first)
+    """
+    ghosts, borderline = _detect_ghosts(curves, rank_filter, threshold)
+    _warn_borderline(borderline, threshold)
+    return ghosts
+
+
+def _detect_ghosts(curves: Dict[str, np.ndarray], rank_filter: int,
+                   threshold: float) -> Tuple[Dict[str, np.ndarray], int]:
+    """detect_ghosts() without the warning: the Ghosts and the borderline count."""
+    N = curves['conductor']
+    candidates = (curves['rank'] == rank_filter) & (N > 1)
+    if 'inv_denom' in curves:
+        # Prepared by load_curves, which already took the magnitudes
+        inv_denom = curves['inv_denom']
+    else:
+        for name in ('L_value', 'L_prime'):
+            if np.any(curves[name] < 0):
+                raise ValueError(f"{name} must be non-negative (a magnitude, "
+                                 f"as load_curves stores it)")
+        if 'log_N' in curves:
+            log_N = curves['log_N']
+        else:
+            # In the caller's precision: float64 columns get a float64 log(N)
+            log_N = _log_conductor(N, np.result_type(curves['L_value'], WORKING_DTYPE))
+        inv_denom = compute_inverse_denominator(curves['L_value'], log_N)
     
-    # Sort by Sha (largest first)
-    ghosts.sort(key=lambda x: x['sha'], reverse=True)
+    # One branchless pass over the columns: S = |L'(E,1)| × 1/(|L(E,1)| × log(N))
+    # for the candidates (inf elsewhere), then the Ghost indices, then sort
+    # those by Sha (largest first; stable so ties keep input order).
+    S = np.full(len(N), np.inf, dtype=inv_denom.dtype)
+    with np.errstate(invalid='ignore'):
+        np.multiply(curves['L_prime'], inv_denom, out=S, where=candidates)
+    idx = np.flatnonzero(np.less(S, threshold))
+    idx = idx[np.argsort(-curves['sha'][idx], kind='stable')]
     
-    return ghosts
+    # In float32 a curve this close to the threshold could classify
+    # differently than in float64; count them so the caller can flag them.
+    # A float64 S (caller-supplied float64 columns) is the reference itself.
+    borderline = 0
+    if S.dtype != np.float64:
+        with np.errstate(invalid='ignore'):
+            borderline = np.count_nonzero(np.abs(S - threshold) <= THRESHOLD_RTOL * threshold)
+    
+    # Report the (few) surviving Ghosts at the precision S was computed
+    # in; D is evaluated in double and rounded back, so it adds no digits
+    # that S does not carry
+    S = S[idx]
+    with np.errstate(divide='ignore'):
+        diffusion = (-np.log10(S.astype(np.float64))).astype(S.dtype)
+    
+    ghosts = {name: curves[name][idx] for name in GHOST_COLUMNS}
+    ghosts['stability'] = S
+    ghosts['diffusion'] = diffusion
+    return ghosts, borderline
 
 
-def compute_statistics(curves: List[Dict], ghosts: List[Dict]) -> Dict:
+def _warn_borderline(borderline: int, threshold: float):
+    """
+    Warn about curves too close to the threshold to classify reliably.
+    
+    Called directly from detect_ghosts and scan_curves, so the warning
+    points at their caller.
+    """
+    if borderline:
+        warnings.warn(
+            f"{borderline} curve(s) have S within float32 rounding of "
+            f"{threshold}; their Ghost classification is not reliable "
+            f"at {np.dtype(WORKING_DTYPE).name} precision",
+            RuntimeWarning, stacklevel=3
+        )
+
+
+def count_curves(curves: Dict[str, np.ndarray]) -> Dict[str, int]:
+    """
+    Count the dataset totals that the detection statistics are based on.
+    
+    Counts are additive, so per-chunk results can simply be summed.
+    """
+    rank0 = (curves['rank'] == 0) & (curves['conductor'] > 1)
+    rank0_sha = curves['sha'][rank0]
+    return {
+        'total_curves': len(curves['conductor']),
+        'rank0_curves': int(rank0.sum()),
+        'total_sha_gt_1': int((rank0_sha > 1).sum()),
+        'total_sha_eq_1': int((rank0_sha == 1).sum()),
+    }
+
+
+def compute_statistics(curves: Dict[str, np.ndarray],
+                       ghosts: Dict[str, np.ndarray],
+                       counts: Optional[Dict[str, int]] = None) -> Dict:
     """
     Compute detection statistics.
+    
+    Pass ``counts`` (from count_curves, e.g. summed over chunks) to skip
+    re-scanning ``curves``, which may then be None.
     """
-    rank0_curves = [c for c in curves if c['rank'] == 0 and c['conductor'] > 1]
+    if counts is None:
+        counts = count_curves(curves)
+    total_sha_gt_1 = counts['total_sha_gt_1']
+    total_sha_eq_1 = counts['total_sha_eq_1']
+    ghost_sha = ghosts['sha']
     
     # Contingency table
-    ghosts_sha_gt_1 = sum(1 for g in ghosts if g['sha'] > 1)
-    ghosts_sha_eq_1 = sum(1 for g in ghosts if g['sha'] == 1)
-    
-    total_sha_gt_1 = sum(1 for c in rank0_curves if c['sha'] > 1)
-    total_sha_eq_1 = sum(1 for c in rank0_curves if c['sha'] == 1)
+    ghosts_sha_gt_1 = int((ghost_sha > 1).sum())
+    ghosts_sha_eq_1 = int((ghost_sha == 1).sum())
     
     # Ghost rates
     p_ghost_given_sha_gt_1 = ghosts_sha_gt_1 / total_sha_gt_1 if total_sha_gt_1 > 0 else 0
     p_ghost_given_sha_eq_1 = ghosts_sha_eq_1 / total_sha_eq_1 if total_sha_eq_1 > 0 else 0
     
     return {
-        'total_curves': len(curves),
-        'rank0_curves': len(rank0_curves),
-        'ghosts_detected': len(ghosts),
+        'total_curves': counts['total_curves'],
+        'rank0_curves': counts['rank0_curves'],
+        'ghosts_detected': len(ghost_sha),
         'ghosts_sha_gt_1': ghosts_sha_gt_1,
         'ghosts_sha_eq_1': ghosts_sha_eq_1,
         'p_ghost_given_sha_gt_1': p_ghost_given_sha_gt_1,
@@ -110,20 +413,99 @@ def compute_statistics(curves: List[Dict], ghosts: List[Dict]) -> Dict:
     }
 
 
-def save_ghosts(ghosts: List[Dict], filepath: str):
-    """Save ghost list to CSV."""
-    if not ghosts:
+def _scan_chunk(lines: List[str], position: Dict[str, int], rank_filter: int
+                ) -> Tuple[Dict[str, np.ndarray], Dict[str, int], int]:
+    """
+    Parse one chunk of raw CSV lines and return its Ghosts, counts and
+    borderline count (warned about once, by scan_curves).
+    """
+    chunk = _parse_curves(lines, position)
+    _add_derived_columns(chunk)
+    ghosts, borderline = _detect_ghosts(chunk, rank_filter, GHOST_THRESHOLD)
+    return ghosts, count_curves(chunk), borderline
+
+
+def scan_curves(filepath: str, chunksize: int = 1_000_000, rank_filter: int = 0,
+                jobs: int = 1) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+    """
+    Detect Ghosts chunk by chunk without loading the whole dataset.
+    
+    Only the (sparse) Ghosts of each chunk are kept; they are merged and
+    re-sorted by Sha at the end, giving the same table as
+    detect_ghosts(load_curves(filepath)).
+    
+    Parameters
+    ----------
+    filepath : str
+        Input CSV
+    chunksize : int
+        Rows per chunk
+    rank_filter : int
+        Only process curves with this rank (default: 0)
+    jobs : int
+        Worker processes for parsing and detection; chunks are
+        independent, so they scale with cores. 1 runs in-process and
+        values <= 0 use every CPU.
+    
+    Returns
+    -------
+    Tuple[Dict[str, np.ndarray], Dict[str, int]]
+        The Ghost table and the summed count_curves() totals
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    
+    with open(filepath, 'r', newline='') as f:
+        position = _read_header(f)
+        chunks = _iter_line_chunks(f, chunksize)
+        if jobs == 1:
+            results = [_scan_chunk(lines, position, rank_filter) for lines in chunks]
+        else:
+            # Keep at most two chunks per worker in flight to bound memory
+            results = []
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for lines in chunks:
+                    pending.append(pool.submit(_scan_chunk, lines, position, rank_filter))
+                    if len(pending) >= 2 * jobs:
+                        results.append(pending.popleft().result())
+                results.extend(future.result() for future in pending)
+    
+    if not results:
+        # Header-only file: scan it as one empty chunk, which gives the same
+        # (empty) table and zero counts as the full-load path
+        results.append(_scan_chunk([], position, rank_filter))
+    
+    counts = dict.fromkeys(results[0][1], 0)
+    for _, chunk_counts, _ in results:
+        for key, value in chunk_counts.items():
+            counts[key] += value
+    _warn_borderline(sum(borderline for _, _, borderline in results), GHOST_THRESHOLD)
+    
+    tables = [table for table, _, _ in results]
+    ghosts = {name: np.concatenate([t[name] for t in tables]) for name in tables[0]}
+    order = np.argsort(-ghosts['sha'], kind='stable')
+    return {name: column[order] for name, column in ghosts.items()}, counts
+
+
+def save_ghosts(ghosts: Dict[str, np.ndarray], filepath: str):
+    """Save ghost table to CSV."""
+    n_ghosts = len(ghosts['label'])
+    if n_ghosts == 0:
         print("No ghosts to save.")
         return
         
     fieldnames = ['label', 'conductor', 'sha', 'stability', 'diffusion']
     
+    # Write whole columns at once: astype(str) and writerows() both run in
+    # C. astype(str) gives the shortest digits that round-trip at each
+    # column's own precision, so float32 values carry no float64 noise.
     with open(filepath, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(ghosts)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(zip(*(ghosts[name].astype(str).tolist() for name in fieldnames)))
     
-    print(f"Saved {len(ghosts)} ghosts to {filepath}")
+    print(f"Saved {n_ghosts} ghosts to {filepath}")
 
 
 def main():
@@ -131,24 +513,43 @@ def main():
     parser.add_argument('--input', '-i', required=True, help='Input CSV file')
     parser.add_argument('--output', '-o', default='ghosts.csv', help='Output CSV file')
     parser.add_argument('--top', '-n', type=int, default=50, help='Show top N ghosts')
+    parser.add_argument('--chunksize', '-c', type=int, default=None,
+                        help='Stream the input in chunks of this many rows '
+                             '(bounds memory on very large datasets)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse the CSV instead of using the column cache')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Worker processes for --chunksize scans (0 = all CPUs)')
     
     args = parser.parse_args()
+    if args.chunksize is not None and args.chunksize <= 0:
+        parser.error('--chunksize must be a positive number of rows')
+    if args.jobs is not None and args.chunksize is None:
+        parser.error('--jobs requires --chunksize')
     
     print("=" * 60)
     print("GHOST RANK DETECTOR")
     print("=" * 60)
     
-    # Load data
-    print(f"\nLoading: {args.input}")
-    curves = load_curves(args.input)
-    print(f"Loaded: {len(curves):,} curves")
-    
-    # Detect ghosts
-    print(f"\nScanning for Ghosts (threshold S < {GHOST_THRESHOLD})...")
-    ghosts = detect_ghosts(curves)
-    
-    # Statistics
-    stats = compute_statistics(curves, ghosts)
+    if args.chunksize is not None:
+        # Stream: load and detect one chunk at a time
+        print(f"\nStreaming: {args.input} ({args.chunksize:,} rows per chunk)")
+        print(f"Scanning for Ghosts (threshold S < {GHOST_THRESHOLD})...")
+        jobs = 1 if args.jobs is None else args.jobs
+        ghosts, counts = scan_curves(args.input, args.chunksize, jobs=jobs)
+        stats = compute_statistics(None, ghosts, counts=counts)
+    else:
+        # Load data
+        print(f"\nLoading: {args.input}")
+        curves = load_curves(args.input, use_cache=not args.no_cache)
+        print(f"Loaded: {len(curves['conductor']):,} curves")
+        
+        # Detect ghosts
+        print(f"\nScanning for Ghosts (threshold S < {GHOST_THRESHOLD})...")
+        ghosts = detect_ghosts(curves)
+        
+        # Statistics
+        stats = compute_statistics(curves, ghosts)
     
     print("\n" + "-" * 60)
     print("DETECTION STATISTICS")
@@ -167,10 +568,13 @@ def main():
     print(f"{'Label':<20} {'Conductor':<12} {'|Ш|':<10} {'√|Ш|':<8} {'S':<12}")
     print("-" * 60)
     
-    for g in ghosts[:args.top]:
-        sqrt_sha = int(math.sqrt(g['sha']))
-        perfect = '✓' if sqrt_sha * sqrt_sha == int(g['sha']) else ''
-        print(f"{g['label']:<20} {g['conductor']:<12} {g['sha']:<10.0f} {sqrt_sha}{perfect:<6} {g['stability']:<12.6f}")
+    top = slice(0, args.top)
+    for label, conductor, sha, stability in zip(
+            ghosts['label'][top].tolist(), ghosts['conductor'][top].tolist(),
+            ghosts['sha'][top].tolist(), ghosts['stability'][top].tolist()):
+        sqrt_sha = int(math.sqrt(sha))
+        perfect = '✓' if sqrt_sha * sqrt_sha == int(sha) else ''
+        print(f"{label:<20} {conductor:<12} {sha:<10.0f} {sqrt_sha}{perfect:<6} {stability:<12.6f}")
     
     # Save results
     save_ghosts(ghosts, args.output)
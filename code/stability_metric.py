@@ -14,6 +14,8 @@ Reference: Murphy (2025), "Ghost Rank: Spectral Phase Transitions and the
 import math
 from typing import Tuple, Optional
 
+import numpy as np
+
 # Ghost threshold - curves below this are likely to have |Ш| > 1
 GHOST_THRESHOLD = 0.025
 
@@ -21,6 +23,27 @@ GHOST_THRESHOLD = 0.025
 DIFFUSION_SLOPE = 1 / math.sqrt(math.e)  # ≈ 0.6065
 
 
+def _is_batch(*args) -> bool:
+    """True if any argument is array-like (NumPy array, list, ...): a batch call."""
+    return any(np.ndim(a) > 0 for a in args)
+
+
+def _stability_batch(numerator, L, conductor) -> np.ndarray:
+    """
+    Element-wise |numerator| / (|L| × log(N)), matching the scalar metrics.
+    
+    The checks run in the scalar order: L = 0 gives inf whatever the
+    conductor, otherwise a conductor <= 1 raises ValueError.
+    """
+    numerator, L, conductor = np.broadcast_arrays(numerator, L, conductor)
+    if np.any((L != 0) & (conductor <= 1)):
+        raise ValueError("Conductor must be > 1")
+    # Conductors <= 1 are left only where L = 0; clamp them so log(N) = 0
+    # and the zero denominator maps to inf
+    log_N = np.log(np.maximum(conductor, 1).astype(np.float64))
+    return compute_stability_vec(numerator, L, log_N)
+
+
 def compute_stability(L_prime: float, L_value: float, conductor: int) -> float:
     """
     Compute the Ghost Rank stability metric S(E).
@@ -44,11 +67,17 @@ def compute_stability(L_prime: float, L_value: float, conductor: int) -> float:
     For rank 0 curves: Lower S indicates potential "Ghost" behavior
     For rank 1 curves: Use compute_stability_rank1() instead
     
+    Array-like inputs (NumPy arrays or lists) are evaluated as a batch,
+    element-wise with the same results and errors as scalar calls, so
+    streaming callers can pass many curves in one call instead of looping.
+    
     Examples
     --------
     >>> S = compute_stability(L_prime=0.5, L_value=2.0, conductor=165066)
     >>> print(f"Stability: {S:.6f}")
     """
+    if _is_batch(L_prime, L_value, conductor):
+        return _stability_batch(L_prime, L_value, conductor)
     if L_value == 0:
         return float('inf')
     if conductor <= 1:
@@ -57,6 +86,60 @@ def compute_stability(L_prime: float, L_value: float, conductor: int) -> float:
     return abs(L_prime) / (abs(L_value) * math.log(conductor))
 
 
+def compute_stability_vec(L_prime: np.ndarray, L_value: np.ndarray,
+                          log_N: np.ndarray) -> np.ndarray:
+    """
+    Vectorized stability metric over column arrays.
+    
+    Parameters
+    ----------
+    L_prime : np.ndarray
+        |L'(E, 1)| per curve
+    L_value : np.ndarray
+        |L(E, 1)| per curve
+    log_N : np.ndarray
+        Precomputed natural log of each conductor
+        
+    Returns
+    -------
+    np.ndarray
+        S(E) per curve; inf wherever the denominator is not positive
+        (L(E,1) = 0 or N <= 1), as in compute_inverse_denominator
+    """
+    denom = np.abs(L_value) * log_N
+    S = np.full(np.broadcast(L_prime, denom).shape, np.inf,
+                dtype=np.result_type(L_prime, denom))
+    with np.errstate(invalid='ignore'):
+        return np.divide(np.abs(L_prime), denom, out=S, where=~(denom <= 0))
+
+
+def compute_inverse_denominator(L_value: np.ndarray,
+                                log_N: np.ndarray) -> np.ndarray:
+    """
+    Precompute 1 / (|L(E,1)| × log(N)) for repeated stability evaluations.
+    
+    S(E) is then |L'(E,1)| × inverse, a multiply instead of a divide, so
+    the column can be computed once and reused across threshold sweeps.
+    
+    Parameters
+    ----------
+    L_value : np.ndarray
+        L(E, 1) per curve (its magnitude is used)
+    log_N : np.ndarray
+        Precomputed natural log of each conductor
+        
+    Returns
+    -------
+    np.ndarray
+        The reciprocal denominator per curve; inf wherever the
+        denominator is not positive (L(E,1) = 0 or N <= 1)
+    """
+    denom = np.abs(L_value) * log_N
+    out = np.full_like(denom, np.inf)
+    with np.errstate(invalid='ignore'):
+        return np.divide(1, denom, out=out, where=denom > 0)
+
+
 def compute_stability_rank1(L_double_prime: float, L_prime: float, 
                             conductor: int) -> float:
     """
@@ -78,6 +161,8 @@ def compute_stability_rank1(L_double_prime: float, L_prime: float,
     float
         The rank-1 stability metric S₁(E)
     """
+    if _is_batch(L_double_prime, L_prime, conductor):
+        return _stability_batch(L_double_prime, L_prime, conductor)
     if L_prime == 0:
         return float('inf')
     if conductor <= 1:
@@ -101,9 +186,26 @@ def compute_diffusion(stability: float, conductor: int) -> float:
     -------
     float
         The diffusion index D = -log₁₀(S) normalized by conductor
+        
+    Notes
+    -----
+    Array inputs are evaluated with a single np.log10 per column, with
+    the scalar semantics: non-positive stabilities map to inf, NaN stays
+    NaN, and otherwise a conductor <= 1 raises ValueError.
     """
+    if _is_batch(stability, conductor):
+        stability, conductor = np.broadcast_arrays(
+            np.asarray(stability, dtype=np.float64), conductor)
+        defined = ~(stability <= 0)
+        if np.any(defined & (conductor <= 1)):
+            raise ValueError("Conductor must be > 1")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            D = -np.log10(stability) / (np.log10(conductor) / 10)
+        return np.where(defined, D, np.inf)
     if stability <= 0:
         return float('inf')
+    if conductor <= 1:
+        raise ValueError("Conductor must be > 1")
     
     log_N = math.log10(conductor)
     return -math.log10(stability) / (log_N / 10)
@@ -118,12 +220,12 @@ def predict_sha(diffusion: float) -> float:
     
     Parameters
     ----------
-    diffusion : float
-        The diffusion index D
+    diffusion : float or np.ndarray
+        The diffusion index D (arrays and lists are evaluated element-wise)
         
     Returns
     -------
-    float
+    float or np.ndarray
         Predicted |Ш| value
         
     Notes
@@ -131,8 +233,9 @@ def predict_sha(diffusion: float) -> float:
     The calibration constant C ≈ -0.0025 from the paper.
     Predictions are typically accurate to within an order of magnitude.
     """
+    if _is_batch(diffusion):
+        diffusion = np.asarray(diffusion, dtype=np.float64)
     C = -0.0025
-    sqrt_e = math.sqrt(math.e)
     log_sha = (diffusion - C) / DIFFUSION_SLOPE
     return 10 ** log_sha
 